@@ -5,81 +5,228 @@ Twitter Capture Telegram Bot
 Extracts images, videos, and GIFs from Twitter/X URLs and sends them to Telegram.
 """
 
+import asyncio
 import os
+import re
 import sys
 import logging
+import queue
+import tempfile
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import IO
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
-from telegram import Update, InputMediaPhoto, InputMediaVideo
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
-import requests
+from telegram import Message, Update, InputMediaPhoto, InputMediaVideo
+from telegram.ext import AIORateLimiter, Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram.error import BadRequest
+import httpx
+from contextlib import suppress
 from io import BytesIO
 
-from .extractor import extract_tweet_data
+try:
+    import uvloop
+except ImportError:  # not built for Windows
+    uvloop = None
+
+from .cache import TTLCache
+from .extractor import BrowserPool, extract_tweet_data
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging (LOG_LEVEL=DEBUG also dumps every incoming attachment)
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+    level=os.getenv('LOG_LEVEL', 'INFO').upper()
 )
 logger = logging.getLogger(__name__)
 
+# Twitter/X (and vxtwitter/fxtwitter/fixupx) status links in message text;
+# profile, search and other pages have no media to extract, so they are not matched
+_TWITTER_URL_RE = re.compile(
+    r'\bhttps?://(?:[\w-]+\.)?(?:twitter|x|vxtwitter|fxtwitter|fixupx)\.com/(?:\w+|i/web)/status/\d+',
+    re.IGNORECASE,
+)
+
+# Any other Twitter/X link (profiles, search, lists), answered with a usage hint
+_TWITTER_LINK_RE = re.compile(
+    r'\bhttps?://(?:[\w-]+\.)?(?:twitter|x|vxtwitter|fxtwitter|fixupx)\.com(?![\w.-])',
+    re.IGNORECASE,
+)
+
+# Recently downloaded media bytes keyed by URL, so album fallbacks and
+# repeated tweets don't fetch the same file twice (capped at 256 MB in total)
+_MEDIA_CACHE = TTLCache(maxsize=256, ttl=600, maxbytes=256 * 1024 * 1024)
 
-async def download_file(url: str) -> BytesIO | None:
-    """Download a file from URL and return as BytesIO."""
+# Telegram file_ids of media already delivered, keyed by source URL, so
+# repeats are resent without Telegram fetching or the bot uploading again
+_FILE_ID_CACHE = TTLCache(maxsize=4096, ttl=7 * 24 * 3600)
+
+# Concurrent downloads from the pbs/video.twimg.com CDN
+_CDN_SEMAPHORE = asyncio.Semaphore(8)
+
+# Seconds allowed for extracting one tweet before the user is told it timed out
+EXTRACT_TIMEOUT = 25
+
+# Hosts connected to at startup (extraction APIs and the fixupx.com fallback)
+_PREWARM_URLS = (
+    'https://api.vxtwitter.com/',
+    'https://api.fxtwitter.com/',
+    'https://cdn.syndication.twimg.com/',
+    'https://fixupx.com/',
+)
+
+# Largest file the Bot API accepts as an upload (50 MB)
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+
+# Downloads larger than this are spooled to a temporary file instead of RAM
+SPOOL_MEMORY_SIZE = 10 * 1024 * 1024
+
+# Videos larger than one part are fetched as parallel ranges of this size
+RANGE_PART_SIZE = 4 * 1024 * 1024
+_VIDEO_HOST = '://video.twimg.com/'
+
+
+async def download_file(client: httpx.AsyncClient, url: str) -> IO[bytes] | None:
+    """Download a file from URL through a spooled temp file, reusing recent downloads.
+    
+    Files up to SPOOL_MEMORY_SIZE are returned in memory as BytesIO; larger
+    ones roll over to disk so concurrent video downloads don't each pin tens
+    of MB of RAM. The caller owns the returned file and should close it.
+    """
+    cached = _MEDIA_CACHE.get(url)
+    if cached is not None:
+        return BytesIO(cached)
+    
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_SIZE)
     try:
-        response = requests.get(url, timeout=15)
-        if response.status_code == 200:
-            return BytesIO(response.content)
+        downloaded = False
+        # The video CDN throttles each connection, so large videos come down in parallel ranges
+        if _VIDEO_HOST in url:
+            try:
+                downloaded = await _download_ranges(client, url, spool)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.info("Ranged download of %s failed, retrying as one stream: %s", url, e)
+                spool.seek(0)
+                spool.truncate()
+        if not downloaded:
+            downloaded = await _download_stream(client, url, spool)
     except Exception as e:
-        logger.warning(f"Failed to download {url}: {e}")
-    return None
+        logger.warning("Failed to download %s: %s", url, e)
+        downloaded = False
+    
+    if not downloaded:
+        spool.close()
+        return None
+    
+    # Files small enough to have stayed in memory are cached and handed over as
+    # BytesIO: PTB can't take an in-memory spool, whose name is None until it
+    # rolls over to disk
+    size = spool.seek(0, os.SEEK_END)
+    spool.seek(0)
+    if size <= SPOOL_MEMORY_SIZE:
+        with spool:
+            data = spool.read()
+        _MEDIA_CACHE[url] = data
+        return BytesIO(data)
+    return spool
+
+
+async def _download_stream(client: httpx.AsyncClient, url: str, spool: IO[bytes]) -> bool:
+    """Stream a file into spool over one connection, refusing anything Telegram can't take."""
+    async with _CDN_SEMAPHORE, client.stream('GET', url) as response:
+        if response.status_code != 200:
+            return False
+        
+        # Telegram rejects larger uploads, so don't download them at all
+        if int(response.headers.get('Content-Length') or 0) > MAX_UPLOAD_SIZE:
+            logger.warning("Skipping %s: larger than the Telegram upload limit", url)
+            return False
+        
+        async for chunk in response.aiter_bytes(65536):
+            spool.write(chunk)
+            if spool.tell() > MAX_UPLOAD_SIZE:
+                logger.warning("Skipping %s: larger than the Telegram upload limit", url)
+                return False
+    return True
+
+
+async def _download_ranges(client: httpx.AsyncClient, url: str, spool: IO[bytes]) -> bool:
+    """Fetch a large file as concurrent byte ranges written into spool at their offsets.
+    
+    Returns False without downloading when the file is small, too large for
+    Telegram, or the server doesn't advertise range support.
+    """
+    head = await client.head(url)
+    size = int(head.headers.get('Content-Length') or 0)
+    if (
+        head.status_code != 200
+        or head.headers.get('Accept-Ranges') != 'bytes'
+        or not RANGE_PART_SIZE < size <= MAX_UPLOAD_SIZE
+    ):
+        return False
+    
+    async def fetch_part(start: int) -> None:
+        end = min(start + RANGE_PART_SIZE, size) - 1
+        async with _CDN_SEMAPHORE:
+            response = await client.get(url, headers={'Range': f'bytes={start}-{end}'})
+        if response.status_code != 206 or len(response.content) != end - start + 1:
+            raise ValueError(f"bad range response {response.status_code} for bytes {start}-{end}")
+        spool.seek(start)
+        spool.write(response.content)
+    
+    parts = [asyncio.ensure_future(fetch_part(start)) for start in range(0, size, RANGE_PART_SIZE)]
+    try:
+        await asyncio.gather(*parts)
+    except BaseException:
+        # Stop the remaining parts before the caller reuses or closes spool
+        for part in parts:
+            part.cancel()
+        raise
+    return True
 
 
 async def debug_message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Debug handler to log all message details including media types."""
+    """Debug handler to log attachment details and echo the detected media types."""
     msg = update.message
     if not msg:
         return
     
-    logger.info("=" * 60)
-    logger.info(f"📨 MESSAGE RECEIVED - ID: {msg.message_id}")
-    logger.info("=" * 60)
-    logger.info(f"📝 Text: {msg.text}")
-    logger.info(f"📝 Caption: {msg.caption}")
-    logger.info(f"📷 Photo: {bool(msg.photo)} ({len(msg.photo) if msg.photo else 0} sizes)")
-    logger.info(f"📄 Document: {bool(msg.document)}")
-    logger.info(f"🎬 Video: {bool(msg.video)}")
-    logger.info(f"🎬 Animation (GIF): {bool(msg.animation)}")
-    logger.info(f"🎤 Voice: {bool(msg.voice)}")
-    logger.info(f"🎵 Audio: {bool(msg.audio)}")
-    logger.info(f"🎭 Sticker: {bool(msg.sticker)}")
-    logger.info(f"📞 Contact: {bool(msg.contact)}")
-    logger.info(f"📍 Location: {bool(msg.location)}")
-    logger.info(f"🔗 Media type property: {getattr(msg, 'media_type', 'N/A')}")
-    
-    # Log file details if document/video
-    if msg.document:
-        logger.info(f"   └─ Document: {msg.document.file_name} ({msg.document.file_size} bytes)")
-    if msg.video:
-        logger.info(f"   └─ Video: {msg.video.file_name} ({msg.video.file_size} bytes, {msg.video.duration}s)")
-    if msg.animation:
-        logger.info(f"   └─ Animation: {msg.animation.file_name} ({msg.animation.file_size} bytes)")
-    if msg.photo:
-        logger.info(f"   └─ Photo sizes: {[p.file_size for p in msg.photo]}")
-    
-    logger.info("=" * 60)
+    # The full dump is only built when debug logging is enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=" * 60)
+        logger.debug("📨 MESSAGE RECEIVED - ID: %s", msg.message_id)
+        logger.debug("=" * 60)
+        logger.debug("📝 Text: %s", msg.text)
+        logger.debug("📝 Caption: %s", msg.caption)
+        logger.debug("📷 Photo: %s (%d sizes)", bool(msg.photo), len(msg.photo))
+        logger.debug("📄 Document: %s", bool(msg.document))
+        logger.debug("🎬 Video: %s", bool(msg.video))
+        logger.debug("🎬 Animation (GIF): %s", bool(msg.animation))
+        logger.debug("🎤 Voice: %s", bool(msg.voice))
+        logger.debug("🎵 Audio: %s", bool(msg.audio))
+        logger.debug("🎭 Sticker: %s", bool(msg.sticker))
+        logger.debug("📞 Contact: %s", bool(msg.contact))
+        logger.debug("📍 Location: %s", bool(msg.location))
+        logger.debug("🔗 Media type property: %s", getattr(msg, 'media_type', 'N/A'))
+        
+        # Log file details if document/video
+        if msg.document:
+            logger.debug("   └─ Document: %s (%s bytes)", msg.document.file_name, msg.document.file_size)
+        if msg.video:
+            logger.debug("   └─ Video: %s (%s bytes, %ss)", msg.video.file_name, msg.video.file_size, msg.video.duration)
+        if msg.animation:
+            logger.debug("   └─ Animation: %s (%s bytes)", msg.animation.file_name, msg.animation.file_size)
+        if msg.photo:
+            logger.debug("   └─ Photo sizes: %s", [p.file_size for p in msg.photo])
+        
+        logger.debug("=" * 60)
     
     # Check if any media is present
     has_media = bool(msg.photo or msg.document or msg.video or msg.animation or msg.voice or msg.audio or msg.sticker)
     
-    # If it has Twitter URL, still process it
-    if msg.text and ('twitter.com' in msg.text or 'x.com' in msg.text):
-        await handle_twitter_url(update, context)
-    elif has_media:
+    if has_media:
         # Send debug info back to user
         debug_info = (
             "🔍 **Media Detected**\n\n"
@@ -103,212 +250,321 @@ async def handle_twitter_url(update: Update, context: ContextTypes.DEFAULT_TYPE)
     text = update.message.text if update.message else ""
     
     # Extract Twitter URLs from message
-    twitter_urls = []
-    for word in text.split():
-        if 'twitter.com' in word or 'x.com' in word:
-            url = word.strip('<>()')
-            if url.startswith('http'):
-                twitter_urls.append(url)
-    
-    if not twitter_urls:
-        return
+    twitter_urls = _TWITTER_URL_RE.findall(text)
     
-    # Process each URL
+    if twitter_urls:
+        await _process_twitter_urls(update, context, twitter_urls)
+
+
+async def handle_non_status_link(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Point out that only tweet links (with /status/<id>) can be extracted."""
+    # Edited messages match too, but there is nothing to reply to
+    if not update.message:
+        return
+    await update.message.reply_text(
+        "⚠️ ツイートの URL を送信してください (/status/<id> を含むもの)\n"
+        "例: https://x.com/username/status/123456"
+    )
+
+
+async def _process_twitter_urls(update: Update, context: ContextTypes.DEFAULT_TYPE, twitter_urls: list) -> None:
+    """Schedule media extraction for each Twitter URL found in a message."""
+    # Run each URL as its own background task so the handler returns at once
+    # and a slow scrape never holds up other links or other chats' updates;
+    # the per-host semaphores bound fixupx.com and CDN load
     for url in twitter_urls:
-        logger.info(f"Processing: {url}")
+        context.application.create_task(_process_one(update, context, url), update=update)
+
+
+async def _process_one(update: Update, context: ContextTypes.DEFAULT_TYPE, url: str) -> None:
+    """Extract and send media for a single Twitter URL."""
+    logger.info("Processing: %s", url)
+    
+    # Send processing message
+    processing_msg = await update.message.reply_text("🔍 Extracting media...")
+    
+    try:
+        # Extract tweet data, giving up on scrapes that stall
+        try:
+            tweet_data = await asyncio.wait_for(
+                extract_tweet_data(url, context.bot_data['http'], context.bot_data['browser_pool']),
+                timeout=EXTRACT_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Extraction timed out after %ss: %s", EXTRACT_TIMEOUT, url)
+            await update.message.reply_text(f"⏱️ Timed out extracting media.\n\nURL: {url}")
+            return
         
-        # Send processing message
-        processing_msg = await update.message.reply_text("🔍 Extracting media...")
+        if not tweet_data:
+            await update.message.reply_text(
+                f"❌ Failed to extract tweet data.\n\n"
+                f"Possible reasons:\n"
+                f"• Private account\n"
+                f"• Deleted tweet\n"
+                f"• Network issues\n\n"
+                f"URL: {url}"
+            )
+            return
         
-        try:
-            # Extract tweet data
-            tweet_data = await extract_tweet_data(url)
+        # Check for specific errors
+        if tweet_data.get('error'):
+            error_type = tweet_data.get('error')
+            error_msg = tweet_data.get('message', 'Unknown error')
             
-            if not tweet_data:
+            if error_type == 'sensitive_content':
                 await update.message.reply_text(
-                    f"❌ Failed to extract tweet data.\n\n"
-                    f"Possible reasons:\n"
-                    f"• Private account\n"
-                    f"• Deleted tweet\n"
-                    f"• Network issues\n\n"
+                    f"⚠️ **Sensitive Content Detected**\n\n"
+                    f"{error_msg}\n\n"
+                    f"Unfortunately, tweets with R18/age-restricted content "
+                    f"require Twitter login to view, which this bot cannot bypass.\n\n"
                     f"URL: {url}"
                 )
-                continue
-            
-            # Check for specific errors
-            if tweet_data.get('error'):
-                error_type = tweet_data.get('error')
-                error_msg = tweet_data.get('message', 'Unknown error')
-                
-                if error_type == 'sensitive_content':
-                    await update.message.reply_text(
-                        f"⚠️ **Sensitive Content Detected**\n\n"
-                        f"{error_msg}\n\n"
-                        f"Unfortunately, tweets with R18/age-restricted content "
-                        f"require Twitter login to view, which this bot cannot bypass.\n\n"
-                        f"URL: {url}"
-                    )
-                elif error_type == 'twitter_error':
-                    await update.message.reply_text(
-                        f"❌ **Twitter Error**\n\n"
-                        f"{error_msg}\n\n"
-                        f"This usually means:\n"
-                        f"• Tweet was deleted\n"
-                        f"• Account is private\n"
-                        f"• Account was suspended\n"
-                        f"• Age verification required\n\n"
-                        f"URL: {url}"
-                    )
-                else:
-                    await update.message.reply_text(f"❌ Error: {error_msg}\n\nURL: {url}")
-                
-                continue
-            
-            # Build caption
-            caption_parts = []
-            if tweet_data.get('username'):
-                caption_parts.append(f"👤 {tweet_data['username']} ({tweet_data.get('handle', '@unknown')})")
-            if tweet_data.get('text'):
-                caption_parts.append(f"\n📝 {tweet_data['text']}")
-            if tweet_data.get('timestamp'):
-                caption_parts.append(f"\n⏰ {tweet_data['timestamp']}")
-            caption_parts.append(f"\n\n🔗 {url}")
-            
-            caption = ''.join(caption_parts)
+            elif error_type == 'twitter_error':
+                await update.message.reply_text(
+                    f"❌ **Twitter Error**\n\n"
+                    f"{error_msg}\n\n"
+                    f"This usually means:\n"
+                    f"• Tweet was deleted\n"
+                    f"• Account is private\n"
+                    f"• Account was suspended\n"
+                    f"• Age verification required\n\n"
+                    f"URL: {url}"
+                )
+            else:
+                await update.message.reply_text(f"❌ Error: {error_msg}\n\nURL: {url}")
             
-            # Combine all media
-            all_media = tweet_data.get('media_urls', []) + tweet_data.get('video_urls', [])
+            return
+        
+        # Build caption
+        caption_parts = []
+        if tweet_data.get('username'):
+            caption_parts.append(f"👤 {tweet_data['username']} ({tweet_data.get('handle', '@unknown')})")
+        if tweet_data.get('text'):
+            caption_parts.append(f"\n📝 {tweet_data['text']}")
+        if tweet_data.get('timestamp'):
+            caption_parts.append(f"\n⏰ {tweet_data['timestamp']}")
+        caption_parts.append(f"\n\n🔗 {url}")
+        
+        caption = ''.join(caption_parts)
+        
+        # Combine all media as (url, is_video) pairs, keeping the extractor's split
+        all_media = (
+            [(media_url, False) for media_url in tweet_data.get('media_urls', [])]
+            + [(video_url, True) for video_url in tweet_data.get('video_urls', [])]
+        )
+        
+        if not all_media:
+            await update.message.reply_text(caption)
+        elif len(all_media) == 1:
+            # Single media
+            media_url, is_video = all_media[0]
+            await _send_single_media(update, context.bot_data['http'], media_url, is_video, caption)
+        else:
+            # Multiple media - send as album
+            await _send_media_album(update, context.bot_data['http'], all_media[:4], caption)
             
-            if not all_media:
-                await update.message.reply_text(caption)
-            elif len(all_media) == 1:
-                # Single media
-                await _send_single_media(update, all_media[0], caption)
-            else:
-                # Multiple media - send as album
-                await _send_media_album(update, all_media[:4], caption)
-                
-        except Exception as e:
-            logger.error(f"Error processing {url}: {e}", exc_info=True)
-            await update.message.reply_text(f"❌ Error: {str(e)}")
-        finally:
-            try:
-                await processing_msg.delete()
-            except Exception:
-                pass
+    except Exception as e:
+        logger.error("Error processing %s: %s", url, e, exc_info=True)
+        await update.message.reply_text(f"❌ Error: {str(e)}")
+    finally:
+        with suppress(Exception):
+            await processing_msg.delete()
 
 
-async def _send_single_media(update: Update, media_url: str, caption: str) -> None:
-    """Send a single media file."""
-    logger.info(f"Downloading: {media_url}")
-    file_bytes = await download_file(media_url)
+async def _send_single_media(
+    update: Update, client: httpx.AsyncClient, media_url: str, is_video: bool, caption: str
+) -> None:
+    """Send a single media file, letting Telegram fetch the URL when it can."""
+    # Resend by file_id when this URL was delivered before, else let Telegram fetch the URL
+    media = _FILE_ID_CACHE.get(media_url, media_url)
+    try:
+        if is_video:
+            sent = await update.message.reply_video(video=media, caption=caption)
+        else:
+            sent = await update.message.reply_photo(photo=media, caption=caption)
+        _remember_file_id(media_url, sent)
+        return
+    except BadRequest as e:
+        logger.info("Telegram could not fetch %s, uploading instead: %s", media_url, e)
+    
+    logger.info("Downloading: %s", media_url)
+    file_bytes = await download_file(client, media_url)
     
     if not file_bytes:
         await update.message.reply_text(f"❌ Failed to download media.\n\n{caption}")
         return
     
-    file_bytes.seek(0)
-    is_video = 'video.twimg.com' in media_url or media_url.endswith('.mp4')
-    
-    try:
-        if is_video:
-            await update.message.reply_video(video=file_bytes, caption=caption)
-        else:
-            await update.message.reply_photo(photo=file_bytes, caption=caption)
-    except Exception as e:
-        logger.warning(f"Send failed, trying document: {e}")
-        file_bytes.seek(0)
-        filename = 'video.mp4' if is_video else 'media.jpg'
-        await update.message.reply_document(document=file_bytes, caption=caption, filename=filename)
+    with file_bytes:
+        try:
+            if is_video:
+                sent = await update.message.reply_video(video=file_bytes, caption=caption)
+            else:
+                sent = await update.message.reply_photo(photo=file_bytes, caption=caption)
+            _remember_file_id(media_url, sent)
+        except Exception as e:
+            logger.warning("Send failed, trying document: %s", e)
+            file_bytes.seek(0)
+            filename = 'video.mp4' if is_video else 'media.jpg'
+            await update.message.reply_document(document=file_bytes, caption=caption, filename=filename)
 
 
-async def _send_media_album(update: Update, media_urls: list, caption: str) -> None:
-    """Send multiple media as an album."""
-    logger.info(f"Downloading {len(media_urls)} files for album")
-    
+def _remember_file_id(media_url: str, message: Message) -> None:
+    """Cache the file_id Telegram assigned to media sent from media_url."""
+    if message.photo:
+        _FILE_ID_CACHE[media_url] = message.photo[-1].file_id
+    elif message.video or message.animation:
+        _FILE_ID_CACHE[media_url] = (message.video or message.animation).file_id
+
+
+def _build_media_group(media_items: list, caption: str) -> list:
+    """Build album entries from (media, is_video) pairs, captioning the first."""
     media_group = []
-    for i, media_url in enumerate(media_urls):
-        file_bytes = await download_file(media_url)
-        if not file_bytes:
-            continue
-        
-        file_bytes.seek(0)
-        is_video = 'video.twimg.com' in media_url or media_url.endswith('.mp4')
-        
+    for i, (media, is_video) in enumerate(media_items):
+        item_caption = caption if i == 0 else None
         if is_video:
-            if i == 0:
-                media_group.append(InputMediaVideo(media=file_bytes, caption=caption))
-            else:
-                media_group.append(InputMediaVideo(media=file_bytes))
+            media_group.append(InputMediaVideo(media=media, caption=item_caption))
         else:
-            if i == 0:
-                media_group.append(InputMediaPhoto(media=file_bytes, caption=caption))
-            else:
-                media_group.append(InputMediaPhoto(media=file_bytes))
+            media_group.append(InputMediaPhoto(media=media, caption=item_caption))
+    return media_group
+
+
+async def _send_media_album(update: Update, client: httpx.AsyncClient, media_items: list, caption: str) -> None:
+    """Send multiple (url, is_video) media items as an album."""
+    # Let Telegram fetch the media itself (or reuse known file_ids); only upload when it refuses a URL
+    try:
+        sent = await update.message.reply_media_group(media=_build_media_group(
+            [(_FILE_ID_CACHE.get(url, url), is_video) for url, is_video in media_items],
+            caption,
+        ))
+        for (url, _), message in zip(media_items, sent):
+            _remember_file_id(url, message)
+        return
+    except BadRequest as e:
+        logger.info("Telegram could not fetch album by URL, uploading instead: %s", e)
+    
+    logger.info("Downloading %s files for album", len(media_items))
+    
+    # Download all items concurrently
+    downloads = await asyncio.gather(*(download_file(client, url) for url, _ in media_items))
+    
+    uploaded = [
+        (url, file_bytes, is_video)
+        for (url, is_video), file_bytes in zip(media_items, downloads)
+        if file_bytes
+    ]
+    
+    # InputMedia reads the file contents up front, so the files can be closed right away
+    try:
+        media_group = _build_media_group(
+            [(file_bytes, is_video) for _, file_bytes, is_video in uploaded],
+            caption,
+        )
+    finally:
+        for file_bytes in downloads:
+            if file_bytes:
+                file_bytes.close()
     
     if not media_group:
         await update.message.reply_text(f"❌ Failed to download any media.\n\n{caption}")
         return
     
     try:
-        await update.message.reply_media_group(media=media_group)
+        sent = await update.message.reply_media_group(media=media_group)
+        for (url, _, _), message in zip(uploaded, sent):
+            _remember_file_id(url, message)
     except Exception as e:
-        logger.error(f"Album failed, sending individually: {e}")
-        # Fallback: send separately
-        for i, media_url in enumerate(media_urls):
-            file_bytes = await download_file(media_url)
-            if file_bytes:
-                file_bytes.seek(0)
-                is_video = 'video.twimg.com' in media_url or media_url.endswith('.mp4')
-                item_caption = f"{i+1}/{len(media_urls)}\n\n{caption}"
-                if is_video:
-                    await update.message.reply_video(video=file_bytes, caption=item_caption)
-                else:
-                    await update.message.reply_photo(photo=file_bytes, caption=item_caption)
+        logger.error("Album failed, sending individually: %s", e)
+        # Fallback: send separately, one at a time so "1/N".."N/N" arrive in order
+        for i, (media_url, is_video) in enumerate(media_items):
+            try:
+                await _send_single_media(update, client, media_url, is_video, f"{i+1}/{len(media_items)}\n\n{caption}")
+            except Exception as e:
+                logger.error("Failed to send %s: %s", media_url, e)
+
+
+# Fixed replies for /start, /help and /banners, built once at import
+_START_TEXT = (
+    "👋 こんにちは！Twitter メディア抽出ボットです。\n\n"
+    "📱 Twitter/X の URL を送信するだけで、全ての画像と動画を抽出します！\n\n"
+    "📋 **使用例:**\n"
+    "• https://twitter.com/username/status/123456\n"
+    "• https://x.com/username/status/123456\n\n"
+    "✨ **機能:**\n"
+    "• 全ての画像を抽出 (最大 4 枚)\n"
+    "• 動画と GIF を抽出\n"
+    "• ツイートテキストを表示\n"
+    "• ログイン不要\n"
+    "• 複数画像はアルバムで送信\n"
+    "• 最新ガチャバナーも確認可能 (/banners)\n\n"
+    "🎮 **対応ゲーム:**\n"
+    "• 原神 (Genshin Impact)\n"
+    "• 崩壊：スターレイル\n"
+    "• 鳴潮 (Wuthering Waves)\n"
+    "• 絶区零 (Zenless Zone Zero)\n\n"
+    "詳しくは /help をご覧ください！"
+)
+
+_HELP_TEXT = (
+    "📖 **使い方:**\n\n"
+    "1. Twitter/X の URL を送信\n"
+    "2. 数秒待つ\n"
+    "3. 全てのメディアファイルを取得！\n\n"
+    "📋 **コマンド:**\n"
+    "/start - ボットを起動\n"
+    "/help - ヘルプを表示\n"
+    "/ping - 動作確認\n"
+    "/banners - 最新ガチャバナーを表示 (原神/スタレ/鳴潮/絶区零)\n\n"
+    "💡 **ヒント:**\n"
+    "• twitter.com と x.com の両方に対応\n"
+    "• 複数の URL も処理可能\n"
+    "• 非公開アカウントは動作しません\n"
+    "• /banners で最新バナーを確認できます"
+)
+
+_BANNERS_TEXT = (
+    "🌟 **原神 (Genshin Impact)** バージョン 6.4\n"
+    "📅 **次期バージョン:** 2026 年 2 月 25 日〜\n\n"
+    "📍 **新キャラクター:**\n"
+    "• ヴァルカ (5★) - 新規\n\n"
+    "📍 **現在 (v6.3):**\n"
+    "• コロンビーナ (5★)\n"
+    "• 紫拝、イルガ (新規)\n\n"
+    "━━━━━━━━━━━━━━━━━━━━\n\n"
+    "🚂 **崩壊：スターレイル (Honkai: Star Rail)** バージョン 4.0\n\n"
+    "📍 **前半** (2/12 〜 3/3):\n"
+    "•  Yao Guang (5★, 物理/欢楽) - 新規\n"
+    "• 復刻：エヴァーナイト + ヒシリンス + ブラックスワン\n"
+    "• 4★: ペラ、 Hanya、清雀\n\n"
+    "📍 **後半** (3/3 〜 3/24):\n"
+    "• Sparxie (5★, 炎/欢楽) - 新規\n"
+    "• 復刻：Cerydra + ラッパ + スパークル\n\n"
+    "🎁 **無料 5★ 選択チケット** 配布中！\n\n"
+    "━━━━━━━━━━━━━━━━━━━━\n\n"
+    "🌊 **鳴潮 (Wuthering Waves)** バージョン 3.1\n\n"
+    "📍 **前半** (2/4 〜 2/26):\n"
+    "• Aemeath (5★) - 新規\n"
+    "• 復刻：ルパ、チサ\n\n"
+    "🎁 **ログインボーナス:** 1600 星音\n"
+    "📅 **終了:** 2026 年 2 月 26 日\n\n"
+    "━━━━━━━━━━━━━━━━━━━━\n\n"
+    "📺 **絶区零 (Zenless Zone Zero)**\n\n"
+    "📍 **前半** (2/6 〜 3/4 12:59):\n"
+    "• 千夏 (5★) - 「想いが織りなす歌」\n\n"
+    "📍 **後半** (3/4 13:00 〜 3/23 15:59):\n"
+    "• アリア (5★) - 「殻の中の魂」\n\n"
+    "━━━━━━━━━━━━━━━━━━━━\n\n"
+    "💡 *情報は公式ソースに基づくものです。ゲーム内でもご確認ください！*"
+)
 
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /start command."""
-    await update.message.reply_text(
-        "👋 こんにちは！Twitter メディア抽出ボットです。\n\n"
-        "📱 Twitter/X の URL を送信するだけで、全ての画像と動画を抽出します！\n\n"
-        "📋 **使用例:**\n"
-        "• https://twitter.com/username/status/123456\n"
-        "• https://x.com/username/status/123456\n\n"
-        "✨ **機能:**\n"
-        "• 全ての画像を抽出 (最大 4 枚)\n"
-        "• 動画と GIF を抽出\n"
-        "• ツイートテキストを表示\n"
-        "• ログイン不要\n"
-        "• 複数画像はアルバムで送信\n"
-        "• 最新ガチャバナーも確認可能 (/banners)\n\n"
-        "🎮 **対応ゲーム:**\n"
-        "• 原神 (Genshin Impact)\n"
-        "• 崩壊：スターレイル\n"
-        "• 鳴潮 (Wuthering Waves)\n"
-        "• 絶区零 (Zenless Zone Zero)\n\n"
-        "詳しくは /help をご覧ください！"
-    )
+    await update.message.reply_text(_START_TEXT)
 
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /help command."""
-    await update.message.reply_text(
-        "📖 **使い方:**\n\n"
-        "1. Twitter/X の URL を送信\n"
-        "2. 数秒待つ\n"
-        "3. 全てのメディアファイルを取得！\n\n"
-        "📋 **コマンド:**\n"
-        "/start - ボットを起動\n"
-        "/help - ヘルプを表示\n"
-        "/ping - 動作確認\n"
-        "/banners - 最新ガチャバナーを表示 (原神/スタレ/鳴潮/絶区零)\n\n"
-        "💡 **ヒント:**\n"
-        "• twitter.com と x.com の両方に対応\n"
-        "• 複数の URL も処理可能\n"
-        "• 非公開アカウントは動作しません\n"
-        "• /banners で最新バナーを確認できます"
-    )
+    await update.message.reply_text(_HELP_TEXT)
 
 
 async def ping_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -318,42 +574,48 @@ async def ping_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
 async def banners_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /banners command - Show latest gacha banners (Japanese)."""
-    await update.message.reply_text(
-        "🌟 **原神 (Genshin Impact)** バージョン 6.4\n"
-        "📅 **次期バージョン:** 2026 年 2 月 25 日〜\n\n"
-        "📍 **新キャラクター:**\n"
-        "• ヴァルカ (5★) - 新規\n\n"
-        "📍 **現在 (v6.3):**\n"
-        "• コロンビーナ (5★)\n"
-        "• 紫拝、イルガ (新規)\n\n"
-        "━━━━━━━━━━━━━━━━━━━━\n\n"
-        "🚂 **崩壊：スターレイル (Honkai: Star Rail)** バージョン 4.0\n\n"
-        "📍 **前半** (2/12 〜 3/3):\n"
-        "•  Yao Guang (5★, 物理/欢楽) - 新規\n"
-        "• 復刻：エヴァーナイト + ヒシリンス + ブラックスワン\n"
-        "• 4★: ペラ、 Hanya、清雀\n\n"
-        "📍 **後半** (3/3 〜 3/24):\n"
-        "• Sparxie (5★, 炎/欢楽) - 新規\n"
-        "• 復刻：Cerydra + ラッパ + スパークル\n\n"
-        "🎁 **無料 5★ 選択チケット** 配布中！\n\n"
-        "━━━━━━━━━━━━━━━━━━━━\n\n"
-        "🌊 **鳴潮 (Wuthering Waves)** バージョン 3.1\n\n"
-        "📍 **前半** (2/4 〜 2/26):\n"
-        "• Aemeath (5★) - 新規\n"
-        "• 復刻：ルパ、チサ\n\n"
-        "🎁 **ログインボーナス:** 1600 星音\n"
-        "📅 **終了:** 2026 年 2 月 26 日\n\n"
-        "━━━━━━━━━━━━━━━━━━━━\n\n"
-        "📺 **絶区零 (Zenless Zone Zero)**\n\n"
-        "📍 **前半** (2/6 〜 3/4 12:59):\n"
-        "• 千夏 (5★) - 「想いが織りなす歌」\n\n"
-        "📍 **後半** (3/4 13:00 〜 3/23 15:59):\n"
-        "• アリア (5★) - 「殻の中の魂」\n\n"
-        "━━━━━━━━━━━━━━━━━━━━\n\n"
-        "💡 *情報は公式ソースに基づくものです。ゲーム内でもご確認ください！*"
+    await update.message.reply_text(_BANNERS_TEXT)
+
+
+async def post_init(application: Application) -> None:
+    """Launch the shared browser pool and HTTP client before polling starts."""
+    browser_pool = BrowserPool(browsers=int(os.getenv('BROWSER_POOL_SIZE', '1')))
+    # One pooled HTTP/2 client for the JSON APIs, fixupx.com and media downloads
+    client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=15.0,
+        follow_redirects=True
+    )
+    application.bot_data['browser_pool'] = browser_pool
+    application.bot_data['http'] = client
+    
+    # Start the browsers while opening keep-alive connections to the hosts
+    # every extraction hits, so the first link doesn't pay for either
+    await asyncio.gather(
+        browser_pool.start(),
+        *(_prewarm(client, url) for url in _PREWARM_URLS)
     )
 
 
+async def _prewarm(client: httpx.AsyncClient, url: str) -> None:
+    """Open a pooled connection to a host; failures only cost the warm start."""
+    try:
+        await client.head(url, timeout=5.0)
+    except httpx.HTTPError as e:
+        logger.warning("Failed to prewarm %s: %s", url, e)
+
+
+async def post_shutdown(application: Application) -> None:
+    """Close the shared browser pool and HTTP client on shutdown."""
+    client = application.bot_data.pop('http', None)
+    if client:
+        await client.aclose()
+    browser_pool = application.bot_data.pop('browser_pool', None)
+    if browser_pool:
+        await browser_pool.close()
+
+
 def main() -> None:
     """Start the bot."""
     token = os.getenv('TELEGRAM_BOT_TOKEN')
@@ -363,26 +625,98 @@ def main() -> None:
         print("❌ Error: Set TELEGRAM_BOT_TOKEN environment variable")
         sys.exit(1)
     
+    # Webhook mode needs the secret, or anyone reaching the port could post
+    # forged updates
+    webhook_url = os.getenv('WEBHOOK_URL')
+    webhook_secret = os.getenv('WEBHOOK_SECRET')
+    if webhook_url and not webhook_secret:
+        logger.error("WEBHOOK_SECRET not set for webhook mode!")
+        print("❌ Error: Set WEBHOOK_SECRET environment variable when WEBHOOK_URL is set")
+        sys.exit(1)
+    
+    # Hand log records to a background thread so stderr writes never block
+    # the event loop; the listener writes through basicConfig's handler
+    root_logger = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    log_listener = QueueListener(log_queue, *root_logger.handlers)
+    root_logger.handlers = [QueueHandler(log_queue)]
+    log_listener.start()
+    
     logger.info("Starting Twitter Media Extractor Bot...")
     
+    # Run on libuv's event loop where available; PTB picks up the current loop
+    if uvloop:
+        asyncio.set_event_loop(uvloop.new_event_loop())
+    
     # Build application
-    application = Application.builder().token(token).build()
+    application = (
+        Application.builder()
+        .token(token)
+        # Bot API calls share one HTTP/2 connection pool (getUpdates keeps its
+        # own); uploads of up to 50 MB get longer than the default timeouts
+        .http_version('2')
+        .connect_timeout(10)
+        .read_timeout(30)
+        .write_timeout(30)
+        .media_write_timeout(120)
+        .pool_timeout(5)
+        # Pace outgoing requests below Telegram's flood limits instead of
+        # hitting RetryAfter when several media sends land at once
+        .rate_limiter(AIORateLimiter(
+            overall_max_rate=28,
+            overall_time_period=1,
+            group_max_rate=18,
+            group_time_period=60,
+            max_retries=3,
+        ))
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     
     # Add handlers
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("help", help_command))
     application.add_handler(CommandHandler("ping", ping_command))
     application.add_handler(CommandHandler("banners", banners_command))
+    # Only the first matching handler runs, so text with a status link goes
+    # straight to extraction and the debug dump only sees attachments
+    application.add_handler(
+        MessageHandler(filters.TEXT & ~filters.COMMAND & filters.Regex(_TWITTER_URL_RE), handle_twitter_url)
+    )
+    # Other Twitter/X links get a hint instead of a doomed extraction (private
+    # chats only, so profile links shared in groups don't draw replies)
     application.add_handler(
-        MessageHandler(filters.ALL & ~filters.COMMAND, debug_message_handler)
+        MessageHandler(
+            filters.TEXT & ~filters.COMMAND & filters.ChatType.PRIVATE & filters.Regex(_TWITTER_LINK_RE),
+            handle_non_status_link
+        )
     )
     application.add_handler(
-        MessageHandler(filters.TEXT & ~filters.COMMAND, handle_twitter_url)
+        MessageHandler(filters.ATTACHMENT, debug_message_handler)
     )
     
     logger.info("Bot is running!")
     print("✅ Bot running! Send Twitter URLs to extract media! 🎨")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    
+    # Telegram pushes updates to WEBHOOK_URL when it is set (the public HTTPS
+    # address, served by a TLS-terminating proxy on the same host unless
+    # WEBHOOK_LISTEN says otherwise); otherwise long-poll
+    try:
+        if webhook_url:
+            application.run_webhook(
+                listen=os.getenv('WEBHOOK_LISTEN', '127.0.0.1'),
+                port=int(os.getenv('WEBHOOK_PORT', '8443')),
+                url_path=urlsplit(webhook_url).path.lstrip('/'),
+                webhook_url=webhook_url,
+                secret_token=webhook_secret,
+                allowed_updates=Update.ALL_TYPES
+            )
+        else:
+            application.run_polling(allowed_updates=Update.ALL_TYPES)
+    finally:
+        # Flush records still queued before the process exits
+        log_listener.stop()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,64 @@
+"""
+Twitter Capture - In-Memory Cache
+
+Small LRU cache with per-entry expiry, used to reuse extraction results
+and downloaded media.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after a fixed time-to-live.
+    
+    With ``maxbytes`` set, values must be bytes-like and the least recently
+    used entries are also evicted once their combined length exceeds it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, maxbytes: int | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._nbytes = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if missing or expired."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._pop(key)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key in self._data:
+            self._pop(key)
+        if self.maxbytes is not None:
+            if len(value) > self.maxbytes:
+                return
+            self._nbytes += len(value)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        while len(self._data) > self.maxsize or (
+            self.maxbytes is not None and self._nbytes > self.maxbytes
+        ):
+            self._pop(next(iter(self._data)))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _pop(self, key: Hashable) -> None:
+        _, value = self._data.pop(key)
+        if self.maxbytes is not None:
+            self._nbytes -= len(value)
+
+
+_MISSING = object()
@@ -3,41 +3,271 @@
 Twitter Media Extractor
 
 Extracts images, videos, and GIFs from Twitter/X URLs.
-Uses httpx for fast meta tag extraction from fixupx.com (primary method).
-Falls back to Playwright for complex cases.
+Queries the vxtwitter, fxtwitter and syndication JSON APIs together, then
+uses httpx for meta tag extraction from fixupx.com. Falls back to Playwright
+for complex cases, using a pool of warm browser contexts on Chromium
+instances launched once at bot startup.
 """
 
+import asyncio
 import logging
+import math
 import re
+from contextlib import asynccontextmanager, suppress
+from html import unescape
+from typing import AsyncIterator
+
 import httpx
+from playwright.async_api import Browser, Page, Playwright, Route, async_playwright
+
+from .cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Chromium flags for the shared headless browser. Only the DOM is read, so
+# background services and image decoding are switched off.
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-breakpad',
+    '--disable-component-update',
+    '--no-first-run',
+    '--mute-audio',
+    '--blink-settings=imagesEnabled=false',
+]
 
-def extract_from_meta_tags(html: str, url: str) -> dict | None:
-    """Extract tweet data from HTML meta tags."""
+# Number of warm browser contexts (and so concurrent fallback pages)
+CONTEXT_POOL_SIZE = 4
+
+# Per-stage timeouts, sized so the whole chain fits the bot's 25 s extraction
+# deadline: JSON APIs (queried together) 5 s, fixupx.com fetch 6 s, then the
+# Playwright fallback's navigation 8 s plus 5 s for the article to render
+API_TIMEOUT = 5.0
+FIXUPX_TIMEOUT = 6.0
+ARTICLE_READY_TIMEOUT_MS = 5000
+
+# Navigation timeout for fallback pages; only the DOM is awaited, never the full load
+NAVIGATION_TIMEOUT_MS = 8000
+
+# Precompiled patterns used on every extraction
+_TITLE_HANDLE_RE = re.compile(r'\((@[a-zA-Z0-9_]+)\)')
+_URL_HANDLE_RE = re.compile(r'/([a-zA-Z0-9_]+)/status/')
+_STATUS_ID_RE = re.compile(r'/status/(\d+)')
+# Scheme and host of any Twitter/X or embed-fixer link, rewritten to fixupx.com
+_FIXUP_HOST_RE = re.compile(
+    r'^https?://(?:[\w-]+\.)?(?:twitter|x|vxtwitter|fxtwitter|fixupx)\.com',
+    re.IGNORECASE,
+)
+# <meta> tags and their attributes, so the page head is scanned once whatever the attribute order
+_META_TAG_RE = re.compile(r'<meta\s[^>]*>', re.IGNORECASE)
+_META_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+# Avatars, emoji and video thumbnails that show up next to a tweet's real media
+_SKIP_IMAGE_RE = re.compile(r'profile_images|amplify_video_thumb|/emoji/|_normal\.')
+# pbs.twimg.com size variant (?name=small, 4096x4096, orig etc.) and the longest
+# side each named size is served at; variants below large are upgraded to it
+_IMAGE_SIZE_RE = re.compile(r'([?&]name=)(\w+)')
+_IMAGE_DIMENSIONS_RE = re.compile(r'(\d+)x(\d+)')
+_IMAGE_SIZES = {'thumb': 150, 'small': 680, 'medium': 1200, 'large': 2048, 'orig': math.inf}
+
+# Digits for the syndication API token
+_BASE36 = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# Extraction results keyed by tweet status ID (media URLs stay valid for hours)
+_TWEET_CACHE = TTLCache(maxsize=1024, ttl=3600)
+
+# Extractions currently running, keyed by tweet status ID
+_INFLIGHT: dict[str, asyncio.Task] = {}
+
+# Concurrent requests to fixupx.com (HTML fetches and Playwright pages), so a
+# burst of links queues here instead of getting rate-limited
+_FIXUPX_SEMAPHORE = asyncio.Semaphore(4)
+
+# Subresources never needed for extraction (URLs are read from attributes,
+# and live connections or manifests only keep the page busy)
+BLOCKED_RESOURCE_TYPES = frozenset({
+    'image', 'media', 'font', 'stylesheet',
+    'websocket', 'eventsource', 'manifest', 'texttrack',
+})
+
+
+async def _block_heavy_resources(route: Route) -> None:
+    """Abort requests for resources the extractor never reads."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """
+    Shared headless Chromium instances for the Playwright fallback.
     
-    # Extract image URLs from og:image and twitter:image meta tags
-    image_urls = []
+    Browsers are launched once at startup and a fixed set of warm contexts
+    is spread across them, each holding one reusable page. Each extraction
+    borrows a page from a queue and it is reset to about:blank afterwards,
+    so the pool size caps concurrent fallback pages and load is balanced by
+    whichever page is free first.
+    
+    Headless launches use chromium-headless-shell, so only that build needs
+    to be installed (playwright install --only-shell chromium).
+    """
+    
+    def __init__(self, browsers: int = 1, contexts: int = CONTEXT_POOL_SIZE):
+        self.browser_count = max(1, browsers)
+        self.context_count = max(1, contexts)
+        self._playwright: Playwright | None = None
+        self._browsers: list[Browser] = []
+        self._pages: asyncio.Queue[Page] = asyncio.Queue()
+        self._page_count = 0
+    
+    async def start(self) -> None:
+        """Launch the browsers and prewarm the context pool concurrently.
+        
+        Launch failures (e.g. the headless shell isn't installed) only
+        disable the Playwright fallback; the HTTP extractors keep working.
+        """
+        try:
+            self._playwright = await async_playwright().start()
+        except Exception as e:
+            logger.error("Failed to start Playwright, browser fallback disabled: %s", e)
+            return
+        
+        launched = await asyncio.gather(
+            *(self._playwright.chromium.launch(headless=True, args=BROWSER_ARGS) for _ in range(self.browser_count)),
+            return_exceptions=True
+        )
+        for result in launched:
+            if isinstance(result, BaseException):
+                logger.error("Failed to launch Chromium: %s", result)
+            else:
+                self._browsers.append(result)
+        if not self._browsers:
+            logger.error("No Chromium instance running, browser fallback disabled")
+            await self.close()
+            return
+        
+        pages = await asyncio.gather(
+            *(self._new_page(self._browsers[i % len(self._browsers)]) for i in range(self.context_count)),
+            return_exceptions=True
+        )
+        for result in pages:
+            if isinstance(result, BaseException):
+                logger.warning("Failed to create browser context: %s", result)
+            else:
+                self._pages.put_nowait(result)
+        self._page_count = self._pages.qsize()
+        if not self._page_count:
+            logger.error("No browser context could be created, browser fallback disabled")
+            await self.close()
+            return
+        
+        logger.info("Launched %s Chromium instance(s) with %s warm contexts", len(self._browsers), self._page_count)
+    
+    async def close(self) -> None:
+        """Close all browsers and stop Playwright."""
+        for browser in self._browsers:
+            # A crashed browser must not keep the others (or Playwright) running
+            with suppress(Exception):
+                await browser.close()
+        self._browsers.clear()
+        self._page_count = 0
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Borrow a pooled page, resetting it to about:blank when it is returned."""
+        if not self._page_count:
+            raise RuntimeError("Browser pool is not running")
+        page = await self._pages.get()
+        try:
+            if page.is_closed():
+                page = await page.context.new_page()
+            yield page
+        finally:
+            try:
+                await page.goto('about:blank')
+            except Exception:
+                # Crashed or stuck page: drop it, a fresh one is opened on next borrow
+                with suppress(Exception):
+                    await page.close()
+            self._pages.put_nowait(page)
     
-    # Pattern 1: <meta property="og:image" content="...">
-    for match in re.findall(r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']', html):
-        if match and match not in image_urls:
-            image_urls.append(match)
+    async def _new_page(self, browser: Browser) -> Page:
+        """Create a context and page, visiting fixupx.com once to warm its connections and cache."""
+        context = await browser.new_context(
+            viewport={'width': 1280, 'height': 800},
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        )
+        await context.route('**/*', _block_heavy_resources)
+        await context.add_init_script(_PAGE_SCRIPT)
+        context.set_default_navigation_timeout(NAVIGATION_TIMEOUT_MS)
+        
+        page = await context.new_page()
+        try:
+            await page.goto('https://fixupx.com/', wait_until='domcontentloaded', timeout=15000)
+            await page.goto('about:blank')
+        except Exception as e:
+            logger.warning("Failed to prewarm browser context: %s", e)
+        
+        return page
+
+
+def _image_size(url: str) -> float:
+    """Longest side of the size variant named in url (0 when unnamed or unknown)."""
+    match = _IMAGE_SIZE_RE.search(url)
+    if not match:
+        return 0
+    dimensions = _IMAGE_DIMENSIONS_RE.fullmatch(match.group(2))
+    if dimensions:
+        return max(int(dimensions.group(1)), int(dimensions.group(2)))
+    return _IMAGE_SIZES.get(match.group(2), 0)
+
+
+def _clean_image_urls(urls: list[str]) -> list[str]:
+    """Drop avatar/emoji images and keep the largest size variant of each, in first-seen order."""
+    images: dict[str, tuple[float, str]] = {}
+    for url in urls:
+        if url and not _SKIP_IMAGE_RE.search(url):
+            base = url.split('?', 1)[0]
+            size = _image_size(url)
+            if base not in images or size > images[base][0]:
+                images[base] = (size, url)
+    return [
+        _IMAGE_SIZE_RE.sub(r'\1large', url) if size < _IMAGE_SIZES['large'] else url
+        for size, url in images.values()
+    ]
+
+
+def _parse_meta_tags(html: str) -> dict[str, list[str]]:
+    """Map each meta property/name in the document head to its content values."""
+    head_end = html.find('</head>')
+    if head_end != -1:
+        html = html[:head_end]
     
-    # Pattern 2: <meta content="..." property="og:image"> (alternate order)
-    for match in re.findall(r'<meta[^>]+content=["\']([^"\']+)[\"\'][^>]+property=["\']og:image["\']', html):
-        if match and match not in image_urls:
-            image_urls.append(match)
+    meta: dict[str, list[str]] = {}
+    for tag in _META_TAG_RE.findall(html):
+        attrs = {name.lower(): double or single for name, double, single in _META_ATTR_RE.findall(tag)}
+        key = attrs.get('property') or attrs.get('name')
+        content = attrs.get('content')
+        if key and content:
+            meta.setdefault(key.lower(), []).append(unescape(content))
+    return meta
+
+
+def extract_from_meta_tags(html: str, url: str) -> dict | None:
+    """Extract tweet data from HTML meta tags."""
     
-    # Also check twitter:image
-    for match in re.findall(r'<meta[^>]+name=["\']twitter:image["\'][^>]+content=["\']([^"\']+)[\"\']', html):
-        if match and match not in image_urls:
-            image_urls.append(match)
+    meta = _parse_meta_tags(html)
     
-    for match in re.findall(r'<meta[^>]+content=["\']([^"\']+)[\"\'][^>]+name=["\']twitter:image["\']', html):
-        if match and match not in image_urls:
-            image_urls.append(match)
+    # Extract image URLs from og:image and twitter:image meta tags
+    image_urls = _clean_image_urls(meta.get('og:image', []) + meta.get('twitter:image', []))
     
     # Extract title and description
     username = 'Unknown'
@@ -45,11 +275,10 @@ def extract_from_meta_tags(html: str, url: str) -> dict | None:
     text = ''
     
     # og:title: "Username (@handle)"
-    title_match = re.search(r'<meta[^>]+property=["\']og:title["\'][^>]+content=["\']([^"\']+)[\"\']', html)
-    if title_match:
-        title = title_match.group(1)
+    if 'og:title' in meta:
+        title = meta['og:title'][0]
         # Parse "Username (@handle)" format
-        handle_match = re.search(r'\((@[a-zA-Z0-9_]+)\)', title)
+        handle_match = _TITLE_HANDLE_RE.search(title)
         if handle_match:
             handle = handle_match.group(1)
             username = title.replace(handle, '').strip()
@@ -58,18 +287,17 @@ def extract_from_meta_tags(html: str, url: str) -> dict | None:
     
     # Fallback: extract handle from URL
     if handle == '@unknown':
-        url_match = re.search(r'/([a-zA-Z0-9_]+)/status/', url)
+        url_match = _URL_HANDLE_RE.search(url)
         if url_match:
             handle = '@' + url_match.group(1)
             username = url_match.group(1)
     
     # og:description: tweet text
-    desc_match = re.search(r'<meta[^>]+property=["\']og:description["\'][^>]+content=["\']([^"\']+)[\"\']', html)
-    if desc_match:
-        text = desc_match.group(1)
+    if 'og:description' in meta:
+        text = meta['og:description'][0]
     
     if image_urls:
-        logger.info(f"Extracted from meta tags: {username} - Images: {len(image_urls)}")
+        logger.info("Extracted from meta tags: %s - Images: %s", username, len(image_urls))
         return {
             'username': username,
             'handle': handle,
@@ -82,10 +310,14 @@ def extract_from_meta_tags(html: str, url: str) -> dict | None:
     return None
 
 
-async def extract_tweet_data(url: str) -> dict | None:
+async def extract_tweet_data(url: str, client: httpx.AsyncClient, browser_pool: BrowserPool) -> dict | None:
     """
     Extract tweet data from Twitter/X URLs.
     
+    HTTP requests go through the shared client so connections are reused.
+    The browser pool is only used when the HTTP fast paths find no media;
+    each fallback borrows a warm context and returns it afterwards.
+    
     Returns dict with:
     - username: Display name
     - handle: @username
@@ -93,256 +325,496 @@ async def extract_tweet_data(url: str) -> dict | None:
     - media_urls: List of image URLs
     - video_urls: List of video/GIF URLs
     - timestamp: Tweet time
+    
+    Successful results are cached by tweet status ID, and concurrent
+    requests for the same tweet share a single extraction.
+    """
+    match = _STATUS_ID_RE.search(url)
+    if not match:
+        return await _fetch_tweet_data(url, None, client, browser_pool)
+    
+    tweet_id = match.group(1)
+    cached = _TWEET_CACHE.get(tweet_id)
+    if cached:
+        logger.info("Cache hit for tweet %s", tweet_id)
+        return cached
+    
+    task = _INFLIGHT.get(tweet_id)
+    if task is None:
+        task = asyncio.create_task(_fetch_and_cache(url, tweet_id, client, browser_pool))
+        _INFLIGHT[tweet_id] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(tweet_id, None))
+    else:
+        logger.info("Joining in-flight extraction for tweet %s", tweet_id)
+    
+    # Shield so one cancelled caller doesn't cancel the extraction for the rest
+    return await asyncio.shield(task)
+
+
+async def _fetch_and_cache(
+    url: str, tweet_id: str, client: httpx.AsyncClient, browser_pool: BrowserPool
+) -> dict | None:
+    """Fetch tweet data and cache it if the extraction succeeded."""
+    tweet_data = await _fetch_tweet_data(url, tweet_id, client, browser_pool)
+    
+    if tweet_data and not tweet_data.get('error'):
+        _TWEET_CACHE[tweet_id] = tweet_data
+    
+    return tweet_data
+
+
+async def _fetch_from_vxtwitter(client: httpx.AsyncClient, tweet_id: str) -> dict | None:
+    """Fetch tweet data from the vxtwitter JSON API."""
+    try:
+        response = await client.get(f"https://api.vxtwitter.com/i/status/{tweet_id}", timeout=API_TIMEOUT)
+        if response.status_code != 200:
+            logger.info("HTTP %s from vxtwitter API", response.status_code)
+            return None
+        data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("vxtwitter API failed for %s: %s", tweet_id, e)
+        return None
+    if not isinstance(data, dict):
+        logger.warning("Unexpected vxtwitter API response for %s", tweet_id)
+        return None
+    
+    media_urls = []
+    video_urls = []
+    for media in data.get('media_extended') or []:
+        if not isinstance(media, dict) or not media.get('url'):
+            continue
+        if media.get('type') == 'image':
+            media_urls.append(media['url'])
+        elif media.get('type') in ('video', 'gif'):
+            video_urls.append(media['url'])
+    
+    if not media_urls and not video_urls and not data.get('text'):
+        return None
+    
+    screen_name = data.get('user_screen_name')
+    logger.info("Extracted from vxtwitter API: %s - Images: %s, Videos: %s", screen_name, len(media_urls), len(video_urls))
+    return {
+        'username': data.get('user_name') or 'Unknown',
+        'handle': f"@{screen_name}" if screen_name else '@unknown',
+        'text': data.get('text', ''),
+        'media_urls': media_urls,
+        'video_urls': video_urls,
+        'timestamp': data.get('date') or 'Unknown'
+    }
+
+
+async def _fetch_from_fxtwitter(client: httpx.AsyncClient, tweet_id: str) -> dict | None:
+    """Fetch tweet data from the fxtwitter JSON API."""
+    try:
+        response = await client.get(f"https://api.fxtwitter.com/status/{tweet_id}", timeout=API_TIMEOUT)
+        if response.status_code != 200:
+            logger.info("HTTP %s from fxtwitter API", response.status_code)
+            return None
+        data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("fxtwitter API failed for %s: %s", tweet_id, e)
+        return None
+    tweet = data.get('tweet') if isinstance(data, dict) else None
+    if not isinstance(tweet, dict):
+        logger.warning("Unexpected fxtwitter API response for %s", tweet_id)
+        return None
+    
+    media = tweet.get('media') if isinstance(tweet.get('media'), dict) else {}
+    media_urls = [photo['url'] for photo in media.get('photos') or [] if isinstance(photo, dict) and photo.get('url')]
+    video_urls = [video['url'] for video in media.get('videos') or [] if isinstance(video, dict) and video.get('url')]
+    
+    if not media_urls and not video_urls and not tweet.get('text'):
+        return None
+    
+    author = tweet.get('author') if isinstance(tweet.get('author'), dict) else {}
+    screen_name = author.get('screen_name')
+    logger.info("Extracted from fxtwitter API: %s - Images: %s, Videos: %s", screen_name, len(media_urls), len(video_urls))
+    return {
+        'username': author.get('name') or 'Unknown',
+        'handle': f"@{screen_name}" if screen_name else '@unknown',
+        'text': tweet.get('text', ''),
+        'media_urls': media_urls,
+        'video_urls': video_urls,
+        'timestamp': tweet.get('created_at') or 'Unknown'
+    }
+
+
+def _to_base36(value: float) -> str:
+    """Format a non-negative float like JavaScript's Number#toString(36).
+    
+    Port of V8's DoubleToRadixCString: fraction digits stop as soon as the
+    string uniquely identifies the double, rounding the last digit up when
+    the remainder says so.
+    """
+    integer = math.floor(value)
+    fraction = value - integer
+    # Half the gap to the next double: digits below this can't change the value
+    delta = max(0.5 * (math.nextafter(value, math.inf) - value), math.ulp(0.0))
+    fraction_digits: list[int] = []
+    while fraction >= delta:
+        fraction *= 36
+        delta *= 36
+        digit = int(fraction)
+        fraction_digits.append(digit)
+        fraction -= digit
+        if (fraction > 0.5 or (fraction == 0.5 and digit & 1)) and fraction + delta > 1:
+            # Round up, carrying into earlier digits (and the integer part)
+            while True:
+                if not fraction_digits:
+                    integer += 1
+                    break
+                digit = fraction_digits.pop() + 1
+                if digit < 36:
+                    fraction_digits.append(digit)
+                    break
+            break
+    
+    digits = ''
+    while True:
+        integer, digit = divmod(integer, 36)
+        digits = _BASE36[digit] + digits
+        if not integer:
+            break
+    if fraction_digits:
+        digits += '.' + ''.join(_BASE36[digit] for digit in fraction_digits)
+    return digits
+
+
+def _syndication_token(tweet_id: str) -> str:
+    """Token the syndication endpoint expects, as computed by the embed widget.
+    
+    Mirrors ((id / 1e15) * Math.PI).toString(36).replace(/(0+|\\.)/g, '').
+    """
+    return _to_base36(int(tweet_id) / 1e15 * math.pi).replace('0', '').replace('.', '')
+
+
+async def _fetch_from_syndication(client: httpx.AsyncClient, tweet_id: str) -> dict | None:
+    """Fetch tweet data from Twitter's public embed (syndication) endpoint."""
+    try:
+        response = await client.get(
+            'https://cdn.syndication.twimg.com/tweet-result',
+            params={'id': tweet_id, 'token': _syndication_token(tweet_id)},
+            timeout=API_TIMEOUT
+        )
+        if response.status_code != 200:
+            logger.info("HTTP %s from syndication API", response.status_code)
+            return None
+        data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Syndication API failed for %s: %s", tweet_id, e)
+        return None
+    if not isinstance(data, dict):
+        logger.warning("Unexpected syndication API response for %s", tweet_id)
+        return None
+    
+    media_urls = []
+    video_urls = []
+    for media in data.get('mediaDetails') or []:
+        if not isinstance(media, dict):
+            continue
+        if media.get('type') == 'photo':
+            if media.get('media_url_https'):
+                media_urls.append(media['media_url_https'])
+        elif media.get('type') in ('video', 'animated_gif'):
+            video_info = media.get('video_info')
+            variants = [
+                variant for variant in (video_info.get('variants') or [] if isinstance(video_info, dict) else [])
+                if isinstance(variant, dict) and variant.get('content_type') == 'video/mp4' and variant.get('url')
+            ]
+            if variants:
+                video_urls.append(max(variants, key=lambda variant: variant.get('bitrate') or 0)['url'])
+    
+    if not media_urls and not video_urls and not data.get('text'):
+        return None
+    
+    user = data.get('user') if isinstance(data.get('user'), dict) else {}
+    screen_name = user.get('screen_name')
+    logger.info("Extracted from syndication API: %s - Images: %s, Videos: %s", screen_name, len(media_urls), len(video_urls))
+    return {
+        'username': user.get('name') or 'Unknown',
+        'handle': f"@{screen_name}" if screen_name else '@unknown',
+        'text': data.get('text', ''),
+        'media_urls': media_urls,
+        'video_urls': video_urls,
+        'timestamp': data.get('created_at') or 'Unknown'
+    }
+
+
+async def _fetch_from_apis(client: httpx.AsyncClient, tweet_id: str) -> dict | None:
+    """Query the JSON APIs concurrently, preferring the first result that has media.
+    
+    A text-only result is only returned once every API has answered, and an
+    API that raises counts as a miss so the others (and later fallbacks) still run.
     """
+    pending = {
+        asyncio.create_task(fetch_from_api(client, tweet_id))
+        for fetch_from_api in (_fetch_from_vxtwitter, _fetch_from_fxtwitter, _fetch_from_syndication)
+    }
+    text_only = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    logger.warning("JSON API failed for %s: %r", tweet_id, task.exception())
+                    continue
+                result = task.result()
+                if result and (result['media_urls'] or result['video_urls']):
+                    return result
+                text_only = text_only or result
+        return text_only
+    finally:
+        # The slower APIs are no longer needed once one has returned media
+        for task in pending:
+            task.cancel()
+
+
+async def _fetch_tweet_data(
+    url: str, tweet_id: str | None, client: httpx.AsyncClient, browser_pool: BrowserPool
+) -> dict | None:
+    """Fetch tweet data via the vxtwitter/fxtwitter/syndication APIs (concurrently), then fixupx.com, then Playwright."""
     try:
         # Convert to fixupx.com URL
-        fx_url = url.replace('twitter.com', 'fixupx.com').replace('x.com', 'fixupx.com')
+        fx_url = _FIXUP_HOST_RE.sub('https://fixupx.com', url, count=1)
+        
+        # FASTEST METHOD: JSON APIs, no HTML parsing needed
+        if tweet_id:
+            api_data = await _fetch_from_apis(client, tweet_id)
+            if api_data:
+                return api_data
         
         # PRIMARY METHOD: Use httpx to fetch HTML and extract meta tags
         # This is faster and avoids JavaScript redirect issues
-        logger.info(f"Fetching {fx_url} with httpx...")
+        logger.info("Fetching %s with httpx...", fx_url)
+        async with _FIXUPX_SEMAPHORE:
+            response = await client.get(fx_url, follow_redirects=False, timeout=FIXUPX_TIMEOUT)
         
-        async with httpx.AsyncClient(follow_redirects=False, timeout=30.0) as client:
-            response = await client.get(fx_url)
-            
-            if response.status_code != 200:
-                logger.warning(f"HTTP {response.status_code} from fixupx.com")
-                return None
-            
-            html = response.text
-            
-            # Check for Twitter error page (no meta tags, just error message)
-            if 'Something went wrong' in html and 'og:image' not in html:
-                logger.warning(f"Twitter error page detected: {fx_url}")
-                return {'error': 'twitter_error', 'message': 'Twitter returned an error. The tweet may be deleted, private, or age-restricted.'}
-            
-            # Extract from meta tags
-            meta_data = extract_from_meta_tags(html, fx_url)
-            
-            if meta_data and meta_data.get('media_urls'):
-                return meta_data
-            
-            # If no images in meta tags but page loaded, might be video-only
-            # Fall back to Playwright for complex extraction
-            logger.info("No images in meta tags, falling back to Playwright...")
+        if response.status_code != 200:
+            logger.warning("HTTP %s from fixupx.com", response.status_code)
+            return None
         
-        # FALLBACK: Use Playwright for full article rendering
-        from playwright.async_api import async_playwright
+        html = response.text
         
-        playwright = await async_playwright().start()
-        browser = await playwright.chromium.launch(
-            headless=True,
-            args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage', '--disable-gpu']
-        )
+        # Check for Twitter error page (no meta tags, just error message)
+        if 'Something went wrong' in html and 'og:image' not in html:
+            logger.warning("Twitter error page detected: %s", fx_url)
+            return {'error': 'twitter_error', 'message': 'Twitter returned an error. The tweet may be deleted, private, or age-restricted.'}
         
-        context = await browser.new_context(
-            viewport={'width': 1280, 'height': 800},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        )
+        # Extract from meta tags
+        meta_data = extract_from_meta_tags(html, fx_url)
         
-        page = await context.new_page()
+        if meta_data and meta_data.get('media_urls'):
+            return meta_data
         
-        try:
-            await page.goto(fx_url, wait_until='domcontentloaded', timeout=30000)
-            
-            # Extract data from meta tags in rendered page
-            meta_data = await page.evaluate('''() => {
-                const getMetaContent = (property) => {
-                    const meta = document.querySelector(`meta[property="${property}"]`) ||
-                                document.querySelector(`meta[name="${property}"]`);
-                    return meta ? meta.getAttribute('content') : null;
-                };
-                
-                const ogImage = getMetaContent('og:image');
-                const twitterImage = getMetaContent('twitter:image');
-                const ogTitle = getMetaContent('og:title');
-                const ogDescription = getMetaContent('og:description');
-                const twitterCreator = getMetaContent('twitter:creator');
-                
-                const allImages = [];
-                document.querySelectorAll('meta[property="og:image"], meta[name="twitter:image"]').forEach(meta => {
-                    const content = meta.getAttribute('content');
-                    if (content && !allImages.includes(content)) {
-                        allImages.push(content);
-                    }
-                });
-                
-                let username = 'Unknown';
-                let handle = '@unknown';
-                
-                if (twitterCreator) {
-                    handle = twitterCreator;
-                    username = twitterCreator.replace('@', '');
-                } else if (ogTitle) {
-                    const match = ogTitle.match(/(.+?)\\s+\\((@[a-zA-Z0-9_]+)\\)/);
-                    if (match) {
-                        username = match[1].trim();
-                        handle = match[2];
-                    }
-                }
-                
-                return {
-                    username: username,
-                    handle: handle,
-                    text: ogDescription || '',
-                    media_urls: allImages,
-                    has_meta: !!(ogImage || twitterImage)
-                };
-            }''')
-            
-            if meta_data.get('has_meta') and meta_data.get('media_urls'):
-                await browser.close()
-                await playwright.stop()
+        # If no images in meta tags but page loaded, might be video-only
+        # Fall back to Playwright for complex extraction
+        logger.info("No images in meta tags, falling back to Playwright...")
+        
+        # FALLBACK: Use Playwright for full article rendering
+        async with _FIXUPX_SEMAPHORE:
+            return await _extract_with_playwright(browser_pool, fx_url)
+        
+    except Exception as e:
+        logger.error("Error extracting tweet data: %s", e)
+        return None
+
+
+# In-page extraction functions, installed once per context as an init script
+# so each call only sends a short invocation instead of re-parsing the source
+_EXTRACT_META_JS = '''() => {
+    const getMetaContent = (property) => {
+        const meta = document.querySelector(`meta[property="${property}"]`) ||
+                    document.querySelector(`meta[name="${property}"]`);
+        return meta ? meta.getAttribute('content') : null;
+    };
+
+    const ogImage = getMetaContent('og:image');
+    const twitterImage = getMetaContent('twitter:image');
+    const ogTitle = getMetaContent('og:title');
+    const ogDescription = getMetaContent('og:description');
+    const twitterCreator = getMetaContent('twitter:creator');
+
+    const imageSet = new Set();
+    document.querySelectorAll('meta[property="og:image"], meta[name="twitter:image"]').forEach(meta => {
+        const content = meta.getAttribute('content');
+        if (content) imageSet.add(content);
+    });
+    const allImages = [...imageSet];
+
+    let username = 'Unknown';
+    let handle = '@unknown';
+
+    if (twitterCreator) {
+        handle = twitterCreator;
+        username = twitterCreator.replace('@', '');
+    } else if (ogTitle) {
+        const match = ogTitle.match(/(.+?)\\s+\\((@[a-zA-Z0-9_]+)\\)/);
+        if (match) {
+            username = match[1].trim();
+            handle = match[2];
+        }
+    }
+
+    return {
+        username: username,
+        handle: handle,
+        text: ogDescription || '',
+        media_urls: allImages,
+        has_meta: !!(ogImage || twitterImage),
+        has_error: document.documentElement.outerHTML.toLowerCase().includes('something went wrong')
+    };
+}'''
+
+_ARTICLE_READY_JS = '''() => {
+    const article = document.querySelector('article[role="article"]');
+    return !!article && !!(
+        article.querySelector('img[src*="pbs.twimg.com/media"]') ||
+        article.querySelector('video') ||
+        article.querySelector('[data-video-url]') ||
+        article.querySelector('div[lang]')
+    );
+}'''
+
+_EXTRACT_TWEET_JS = '''() => {
+    const GIF_RE = /tweet_video(?:_thumb)?\\/([a-zA-Z0-9_-]+)(?:\\.jpg|\\.mp4|\\.gif)?/;
+
+    const article = document.querySelector('article[role="article"]');
+    if (!article) return null;
+
+    let username = 'Unknown';
+    let handle = '@unknown';
+
+    const nameElement = article.querySelector('[data-testid="User-Name"]');
+    if (nameElement) {
+        let foundName = false;
+        for (const span of nameElement.querySelectorAll('span')) {
+            const text = span.textContent.trim();
+            if (!text) continue;
+            if (text.startsWith('@')) {
+                handle = text;
+                break;
+            }
+            if (!foundName) {
+                username = text;
+                foundName = true;
+            }
+        }
+    }
+
+    if (handle === '@unknown') {
+        const urlMatch = window.location.pathname.match(/\\/([a-zA-Z0-9_]+)\\/status\\//);
+        if (urlMatch) {
+            handle = '@' + urlMatch[1];
+        }
+    }
+
+    const textContainer = article.querySelector('div[lang]');
+    const text = textContainer ? textContainer.innerText.trim() : '';
+
+    const SKIP_IMG_RE = /profile_images|amplify_video_thumb|\\/emoji\\/|_normal\\./;
+    const mediaImgs = [];
+    for (const img of article.querySelectorAll('img[src*="pbs.twimg.com"]')) {
+        if (img.src && !SKIP_IMG_RE.test(img.src)) {
+            mediaImgs.push(img.src);
+            if (mediaImgs.length === 4) break;
+        }
+    }
+
+    const videos = new Set();
+
+    const videoElements = article.querySelectorAll('video');
+    videoElements.forEach(video => {
+        if (video.src) videos.add(video.src);
+        const sources = video.querySelectorAll('source');
+        sources.forEach(source => {
+            if (source.src) videos.add(source.src);
+        });
+    });
+
+    const twimgElements = article.querySelectorAll('[src*="video.twimg.com"], [data-src*="video.twimg.com"]');
+    twimgElements.forEach(el => {
+        const src = el.getAttribute('src');
+        if (src && src.includes('video.twimg.com')) videos.add(src);
+        const dataSrc = el.getAttribute('data-src');
+        if (dataSrc && dataSrc.includes('video.twimg.com')) videos.add(dataSrc);
+    });
+
+    // GIF thumbnails and data-video-url only matter when no
+    // video element or twimg attribute turned up
+    if (videos.size === 0) {
+        const gifImgElements = article.querySelectorAll('img[src*="tweet_video"]');
+        gifImgElements.forEach(img => {
+            const src = img.getAttribute('src') || img.getAttribute('data-src');
+            const match = src && src.match(GIF_RE);
+            if (match) videos.add(`https://video.twimg.com/tweet_video/${match[1]}.mp4`);
+        });
+
+        const videoContainers = article.querySelectorAll('[data-video-url]');
+        videoContainers.forEach(el => {
+            const videoUrl = el.getAttribute('data-video-url');
+            if (videoUrl && videoUrl.includes('video.twimg.com')) videos.add(videoUrl);
+        });
+    }
+
+    const uniqueVideos = [...videos];
+
+    const timeElement = article.querySelector('time');
+    const timestamp = timeElement ? timeElement.textContent.trim() : new Date().toLocaleString();
+
+    return {
+        username: username,
+        handle: handle,
+        text: text,
+        media_urls: mediaImgs,
+        video_urls: uniqueVideos,
+        timestamp: timestamp
+    };
+}'''
+
+_PAGE_SCRIPT = (
+    'window.__extractMeta = ' + _EXTRACT_META_JS + ';\n'
+    'window.__articleReady = ' + _ARTICLE_READY_JS + ';\n'
+    'window.__extractTweet = ' + _EXTRACT_TWEET_JS + ';\n'
+)
+
+
+async def _extract_with_playwright(browser_pool: BrowserPool, fx_url: str) -> dict | None:
+    """Render the tweet page in a context borrowed from the pool."""
+    try:
+        async with browser_pool.page() as page:
+            await page.goto(fx_url, wait_until='domcontentloaded')
+
+            # Extract meta tags and check for the error page in one round-trip
+            meta_data = await page.evaluate('() => window.__extractMeta()')
+
+            image_urls = _clean_image_urls(meta_data.get('media_urls') or [])
+            if meta_data.get('has_meta') and image_urls:
                 return {
                     'username': meta_data['username'],
                     'handle': meta_data['handle'],
                     'text': meta_data['text'],
-                    'media_urls': meta_data['media_urls'],
+                    'media_urls': image_urls,
                     'video_urls': [],
                     'timestamp': 'Unknown'
                 }
-            
+
             # Try to find full article
-            page_content = await page.content()
-            
-            if 'something went wrong' in page_content.lower():
-                await browser.close()
-                await playwright.stop()
+            if meta_data.get('has_error'):
                 return {'error': 'twitter_error', 'message': 'Twitter returned an error. The tweet may be deleted, private, or age-restricted.'}
-            
-            await page.wait_for_selector('article[role="article"]', timeout=10000)
-            
-            tweet_data = await page.evaluate('''() => {
-                const article = document.querySelector('article[role="article"]');
-                if (!article) return null;
-                
-                let username = 'Unknown';
-                let handle = '@unknown';
-                
-                const nameElement = article.querySelector('[data-testid="User-Name"]');
-                if (nameElement) {
-                    const spans = Array.from(nameElement.querySelectorAll('span'));
-                    const texts = spans.map(s => s.textContent.trim()).filter(t => t.length > 0);
-                    
-                    for (const text of texts) {
-                        if (!text.startsWith('@') && text.length > 0) {
-                            username = text;
-                            break;
-                        }
-                    }
-                    
-                    for (const text of texts) {
-                        if (text.startsWith('@')) {
-                            handle = text;
-                            break;
-                        }
-                    }
-                }
-                
-                if (handle === '@unknown') {
-                    const urlMatch = window.location.pathname.match(/\\/([a-zA-Z0-9_]+)\\/status\\//);
-                    if (urlMatch) {
-                        handle = '@' + urlMatch[1];
-                    }
-                }
-                
-                let text = '';
-                const textContainer = article.querySelector('div[lang]');
-                if (textContainer) {
-                    const textSpans = textContainer.querySelectorAll('span');
-                    if (textSpans.length > 0) {
-                        text = Array.from(textSpans).map(span => span.textContent).join('').trim();
-                    } else {
-                        text = textContainer.textContent.trim();
-                    }
-                }
-                
-                const mediaImgs = Array.from(article.querySelectorAll('img[src*="pbs.twimg.com"]'))
-                    .map(img => img.src)
-                    .filter(src => src && src.length > 0)
-                    .filter(src => !src.includes('profile_images'))
-                    .filter(src => !src.includes('amplify_video_thumb'))
-                    .filter(src => !src.includes('/emoji/'))
-                    .filter(src => !src.includes('_normal.'))
-                    .slice(0, 4);
-                
-                const videos = [];
-                
-                const videoElements = article.querySelectorAll('video');
-                videoElements.forEach(video => {
-                    if (video.src) videos.push(video.src);
-                    const sources = video.querySelectorAll('source');
-                    sources.forEach(source => {
-                        if (source.src) videos.push(source.src);
-                    });
-                });
-                
-                const allElements = article.querySelectorAll('*');
-                allElements.forEach(el => {
-                    const src = el.getAttribute('src');
-                    if (src && src.includes('video.twimg.com') && !videos.includes(src)) {
-                        videos.push(src);
-                    }
-                    const dataSrc = el.getAttribute('data-src');
-                    if (dataSrc && dataSrc.includes('video.twimg.com') && !videos.includes(dataSrc)) {
-                        videos.push(dataSrc);
-                    }
-                });
-                
-                const gifImgElements = article.querySelectorAll('img[src*="tweet_video"]');
-                gifImgElements.forEach(img => {
-                    let src = img.getAttribute('src') || img.getAttribute('data-src');
-                    if (src && src.includes('tweet_video')) {
-                        const match = src.match(/tweet_video(?:_thumb)?\\/([a-zA-Z0-9_-]+)(?:\\.jpg|\\.mp4|\\.gif)?/);
-                        if (match) {
-                            const videoId = match[1];
-                            const videoUrl = `https://video.twimg.com/tweet_video/${videoId}.mp4`;
-                            if (!videos.includes(videoUrl)) {
-                                videos.push(videoUrl);
-                            }
-                        }
-                    }
-                });
-                
-                const videoContainers = article.querySelectorAll('[data-video-url]');
-                videoContainers.forEach(el => {
-                    const videoUrl = el.getAttribute('data-video-url');
-                    if (videoUrl && videoUrl.includes('video.twimg.com') && !videos.includes(videoUrl)) {
-                        videos.push(videoUrl);
-                    }
-                });
-                
-                const uniqueVideos = [...new Set(videos)];
-                
-                const timeElement = article.querySelector('time');
-                const timestamp = timeElement ? timeElement.textContent.trim() : new Date().toLocaleString();
-                
-                return {
-                    username: username,
-                    handle: handle,
-                    text: text,
-                    media_urls: mediaImgs,
-                    video_urls: uniqueVideos,
-                    timestamp: timestamp
-                };
-            }''')
-            
-            await browser.close()
-            await playwright.stop()
-            
+
+            # Wait until the article has rendered media or text, not just its shell
+            await page.wait_for_function('() => window.__articleReady()', timeout=ARTICLE_READY_TIMEOUT_MS)
+
+            tweet_data = await page.evaluate('() => window.__extractTweet()')
+
             if tweet_data:
-                logger.info(f"Extracted tweet (article mode): {tweet_data.get('username')}")
+                tweet_data['media_urls'] = _clean_image_urls(tweet_data['media_urls'])
+                logger.info("Extracted tweet (article mode): %s", tweet_data.get('username'))
                 return tweet_data
-            
-            logger.warning(f"No tweet data extracted from {fx_url}")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Playwright error: {e}")
-            await browser.close()
-            await playwright.stop()
+
+            logger.warning("No tweet data extracted from %s", fx_url)
             return None
-        
+
     except Exception as e:
-        logger.error(f"Error extracting tweet data: {e}")
+        logger.error("Playwright error: %s", e)
         return None
@@ -0,0 +1,69 @@
+"""BrowserPool startup must degrade, not fail, when Chromium can't launch."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from twitter_capture import extractor
+
+
+class _FakePlaywright:
+    def __init__(self):
+        self.stopped = False
+        self.chromium = SimpleNamespace(launch=self._launch)
+
+    async def _launch(self, **kwargs):
+        raise RuntimeError("Executable doesn't exist")
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+def test_failed_launch_disables_fallback(monkeypatch):
+    playwright = _FakePlaywright()
+    monkeypatch.setattr(extractor, 'async_playwright', lambda: playwright)
+
+    async def run():
+        pool = extractor.BrowserPool(browsers=2)
+        await pool.start()
+        with pytest.raises(RuntimeError):
+            async with pool.page():
+                pass
+        return await extractor._extract_with_playwright(pool, 'https://fixupx.com/u/status/1')
+
+    assert asyncio.run(run()) is None
+    assert playwright.stopped
+
+
+def test_failed_contexts_close_browsers(monkeypatch):
+    closed = []
+
+    class Browser:
+        async def new_context(self, **kwargs):
+            raise RuntimeError("Target closed")
+
+        async def close(self):
+            closed.append(self)
+
+    playwright = _FakePlaywright()
+
+    async def launch(**kwargs):
+        return Browser()
+
+    playwright.chromium = SimpleNamespace(launch=launch)
+    monkeypatch.setattr(extractor, 'async_playwright', lambda: playwright)
+
+    async def run():
+        pool = extractor.BrowserPool(browsers=2)
+        await pool.start()
+        with pytest.raises(RuntimeError):
+            async with pool.page():
+                pass
+
+    asyncio.run(run())
+    assert len(closed) == 2
+    assert playwright.stopped
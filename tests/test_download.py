@@ -0,0 +1,111 @@
+"""Downloaded media must be accepted by PTB's upload path (parse_file_input)."""
+
+import asyncio
+
+import httpx
+from telegram import InputFile, InputMediaPhoto, InputMediaVideo, PhotoSize, Video
+from telegram._utils.files import parse_file_input
+
+from twitter_capture import bot
+
+
+def _download(url: str, body: bytes) -> object:
+    """Run download_file against a mock server that returns body for GET url."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await bot.download_file(client, url)
+
+    bot._MEDIA_CACHE._data.clear()
+    bot._MEDIA_CACHE._nbytes = 0
+    return asyncio.run(run())
+
+
+def test_small_download_uploads_as_photo():
+    body = b'\xff\xd8' + b'x' * 1000
+    file = _download('https://pbs.twimg.com/media/a.jpg?name=large', body)
+
+    parsed = parse_file_input(file, PhotoSize)
+    assert isinstance(parsed, InputFile)
+    assert parsed.input_file_content == body
+
+    file.seek(0)
+    media = InputMediaPhoto(media=file)
+    assert media.media.input_file_content == body
+
+
+def test_cached_download_uploads_as_photo():
+    body = b'\xff\xd8' + b'y' * 1000
+    _download('https://pbs.twimg.com/media/b.jpg?name=large', body)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(500))) as client:
+            return await bot.download_file(client, 'https://pbs.twimg.com/media/b.jpg?name=large')
+
+    file = asyncio.run(run())
+    assert isinstance(parse_file_input(file, PhotoSize), InputFile)
+
+
+def test_large_download_uploads_from_disk():
+    body = b'v' * (bot.SPOOL_MEMORY_SIZE + 1024)
+    file = _download('https://example.com/large.mp4', body)
+
+    with file:
+        parsed = parse_file_input(file, Video)
+        assert isinstance(parsed, InputFile)
+        assert parsed.input_file_content == body
+
+
+def test_large_download_in_media_group():
+    body = b'v' * (bot.SPOOL_MEMORY_SIZE + 1024)
+    file = _download('https://example.com/large.mp4', body)
+
+    with file:
+        media = InputMediaVideo(media=file)
+        assert media.media.input_file_content == body
+
+
+def _ranged_download(url: str, body: bytes) -> tuple[object, list[str]]:
+    """Run download_file against a mock CDN that serves body by byte range."""
+    ranges = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers = {'Accept-Ranges': 'bytes', 'Content-Length': str(len(body))}
+        if request.method == 'HEAD':
+            return httpx.Response(200, headers=headers)
+        spec = request.headers.get('Range')
+        if spec is None:
+            return httpx.Response(200, content=body)
+        ranges.append(spec)
+        start, end = map(int, spec.removeprefix('bytes=').split('-'))
+        return httpx.Response(206, content=body[start:end + 1])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await bot.download_file(client, url)
+
+    bot._MEDIA_CACHE._data.clear()
+    bot._MEDIA_CACHE._nbytes = 0
+    return asyncio.run(run()), ranges
+
+
+def test_ranged_video_in_memory_uploads():
+    body = bytes(range(256)) * ((bot.RANGE_PART_SIZE + 1024 * 1024) // 256)
+    file, ranges = _ranged_download('https://video.twimg.com/ext_tw_video/1/pu/vid/a.mp4', body)
+
+    assert len(ranges) == 2
+    parsed = parse_file_input(file, Video)
+    assert isinstance(parsed, InputFile)
+    assert parsed.input_file_content == body
+
+
+def test_ranged_video_on_disk_uploads():
+    body = bytes(range(256)) * ((bot.SPOOL_MEMORY_SIZE + 1024 * 1024) // 256)
+    file, ranges = _ranged_download('https://video.twimg.com/ext_tw_video/1/pu/vid/b.mp4', body)
+
+    assert len(ranges) == 3
+    with file:
+        media = InputMediaVideo(media=file)
+        assert media.media.input_file_content == body
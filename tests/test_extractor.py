@@ -0,0 +1,189 @@
+"""Tests for the extractor helpers and JSON API providers."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from twitter_capture import extractor
+from twitter_capture.extractor import (
+    _clean_image_urls,
+    _fetch_from_apis,
+    _fetch_from_fxtwitter,
+    _fetch_from_syndication,
+    _fetch_from_vxtwitter,
+    _syndication_token,
+)
+
+
+# Expected values from node: ((Number(id) / 1e15) * Math.PI).toString(36).replace(/(0+|\.)/g, '')
+@pytest.mark.parametrize('tweet_id, token', [
+    ('1843950000000000000', '4gwxty2r3su'),
+    ('1234567890123456789', '2zqic77uqyk'),
+    ('463440424141459456', '14fxvks611f'),
+    ('20', '6dq1a2xwd93'),
+    ('1', 'bhi2ay3f28n'),
+])
+def test_syndication_token_matches_embed_widget(tweet_id, token):
+    assert _syndication_token(tweet_id) == token
+
+
+def test_apis_return_first_usable_result():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == 'api.fxtwitter.com':
+            return httpx.Response(200, json={'tweet': {
+                'text': 'hello',
+                'author': {'name': 'Name', 'screen_name': 'user'},
+                'media': {'photos': [{'url': 'https://pbs.twimg.com/media/a.jpg'}]},
+            }})
+        return httpx.Response(404)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await _fetch_from_apis(client, '20')
+
+    data = asyncio.run(run())
+    assert data['handle'] == '@user'
+    assert data['media_urls'] == ['https://pbs.twimg.com/media/a.jpg']
+
+
+def test_apis_return_none_when_all_fail():
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(500))) as client:
+            return await _fetch_from_apis(client, '20')
+
+    assert asyncio.run(run()) is None
+
+
+def test_apis_prefer_media_over_faster_text_only_result():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == 'api.vxtwitter.com':
+            return httpx.Response(200, json={'text': 'hello', 'user_screen_name': 'vx'})
+        if request.url.host == 'api.fxtwitter.com':
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={'tweet': {
+                'text': 'hello',
+                'author': {'screen_name': 'fx'},
+                'media': {'videos': [{'url': 'https://video.twimg.com/v.mp4'}]},
+            }})
+        return httpx.Response(404)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await _fetch_from_apis(client, '20')
+
+    data = asyncio.run(run())
+    assert data['handle'] == '@fx'
+    assert data['video_urls'] == ['https://video.twimg.com/v.mp4']
+
+
+def test_apis_fall_back_to_text_only_result():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == 'api.vxtwitter.com':
+            return httpx.Response(200, json={'text': 'hello', 'user_screen_name': 'vx'})
+        return httpx.Response(404)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await _fetch_from_apis(client, '20')
+
+    data = asyncio.run(run())
+    assert data['handle'] == '@vx'
+    assert data['media_urls'] == [] and data['video_urls'] == []
+
+
+def test_raising_api_does_not_skip_fixupx_fallback(monkeypatch):
+    async def broken(client, tweet_id):
+        raise AttributeError("'str' object has no attribute 'get'")
+
+    monkeypatch.setattr(extractor, '_fetch_from_fxtwitter', broken)
+    page = (
+        '<html><head><meta property="og:title" content="Name (@user)">'
+        '<meta property="og:image" content="https://pbs.twimg.com/media/a.jpg?name=small">'
+        '</head></html>'
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == 'fixupx.com':
+            return httpx.Response(200, text=page)
+        return httpx.Response(404)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await extractor._fetch_tweet_data('https://x.com/user/status/20', '20', client, None)
+
+    data = asyncio.run(run())
+    assert data['media_urls'] == ['https://pbs.twimg.com/media/a.jpg?name=large']
+
+
+def _tweet(handle='@unknown', username='Unknown', media_urls=(), video_urls=(), timestamp='Unknown'):
+    """Expected provider result for a payload whose text is 'hi'."""
+    return {
+        'username': username,
+        'handle': handle,
+        'text': 'hi',
+        'media_urls': list(media_urls),
+        'video_urls': list(video_urls),
+        'timestamp': timestamp,
+    }
+
+
+@pytest.mark.parametrize('provider, payload, expected', [
+    # vxtwitter
+    (_fetch_from_vxtwitter, [], None),
+    (_fetch_from_vxtwitter, 'junk', None),
+    (_fetch_from_vxtwitter, {'text': 'hi', 'media_extended': [{'type': 'image'}, 'junk', {'type': 'gif', 'url': 'g'}]},
+     _tweet(video_urls=['g'])),
+    (_fetch_from_vxtwitter, {'text': 'hi', 'user_name': 'Name', 'user_screen_name': 'user',
+                             'media_extended': [{'type': 'image', 'url': 'p'}]},
+     _tweet('@user', 'Name', media_urls=['p'])),
+    # fxtwitter
+    (_fetch_from_fxtwitter, ['junk'], None),
+    (_fetch_from_fxtwitter, {'tweet': 'junk'}, None),
+    (_fetch_from_fxtwitter, {'tweet': {'text': 'hi', 'media': {'photos': ['junk', {'url': 'p'}], 'videos': 'junk'}}},
+     _tweet(media_urls=['p'])),
+    (_fetch_from_fxtwitter, {'tweet': {'text': 'hi', 'author': 'junk', 'media': 'junk'}}, _tweet()),
+    (_fetch_from_fxtwitter, {'tweet': {'text': 'hi', 'author': ['junk'], 'media': {'videos': [{'url': 'v'}]}}},
+     _tweet(video_urls=['v'])),
+    # syndication
+    (_fetch_from_syndication, 'junk', None),
+    (_fetch_from_syndication, {'text': 'hi', 'mediaDetails': [
+        'junk',
+        {'type': 'photo'},
+        {'type': 'photo', 'media_url_https': 'p'},
+        {'type': 'video', 'video_info': None},
+        {'type': 'video', 'video_info': {'variants': ['junk', {'content_type': 'video/mp4'}]}},
+        {'type': 'animated_gif', 'video_info': {'variants': [
+            {'content_type': 'video/mp4', 'url': 'low', 'bitrate': None},
+            {'content_type': 'video/mp4', 'url': 'high', 'bitrate': 832000},
+            {'content_type': 'application/x-mpegURL', 'url': 'hls'},
+        ]}},
+    ]}, _tweet(media_urls=['p'], video_urls=['high'])),
+    (_fetch_from_syndication, {'text': 'hi', 'user': 'junk', 'created_at': 'now'}, _tweet(timestamp='now')),
+])
+def test_provider_tolerates_malformed_payload(provider, payload, expected):
+    async def run():
+        transport = httpx.MockTransport(lambda r: httpx.Response(200, json=payload))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await provider(client, '20')
+
+    assert asyncio.run(run()) == expected
+
+
+def test_clean_image_urls_keeps_largest_variant():
+    base = 'https://pbs.twimg.com/media/abc?format=jpg'
+    assert _clean_image_urls([
+        f'{base}&name=small',
+        'https://pbs.twimg.com/profile_images/1/x_normal.jpg',
+        f'{base}&name=orig',
+        'https://pbs.twimg.com/media/def?format=png&name=medium',
+        f'{base}&name=large',
+    ]) == [f'{base}&name=orig', 'https://pbs.twimg.com/media/def?format=png&name=large']
+
+
+def test_clean_image_urls_keeps_sizes_above_large():
+    url = 'https://pbs.twimg.com/media/abc?format=jpg&name=4096x4096'
+    assert _clean_image_urls([url, 'https://pbs.twimg.com/media/abc?format=jpg&name=900x900']) == [url]
+    assert _clean_image_urls(['https://pbs.twimg.com/media/abc?name=360x360']) == [
+        'https://pbs.twimg.com/media/abc?name=large'
+    ]